@@ -4,3 +4,14 @@ from django.apps import AppConfig
 class CommonConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'common'
+
+    def ready(self):
+        from django.core.signals import request_started
+        from django.db import connections
+        from django.db.backends.signals import connection_created
+        from common.helpers.query_stats_helpers import flush_query_stats, install_query_stats
+
+        connection_created.connect(install_query_stats)
+        request_started.connect(flush_query_stats)
+        for connection in connections.all(initialized_only=True):
+            install_query_stats(connection)
@@ -0,0 +1,244 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Least
+from rest_framework import status
+from rest_framework.exceptions import APIException, Throttled
+from common.models import AdmissionBucket
+
+
+class ServiceOverloaded(APIException):
+    """
+    Raised when a request waited longer than the latency target for a concurrency slot.
+    """
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'The service is overloaded; please retry later.'
+    default_code = 'service_overloaded'
+
+    def __init__(self, wait, detail=None):
+        super().__init__(detail)
+        self.wait = wait
+
+
+class LocalTokenBuckets:
+    """
+    Per-user token buckets kept in the memory of the worker process.
+
+    Only the most recently used buckets are kept; a dropped bucket was refilling anyway and
+    comes back full, so max_buckets only needs to exceed the users active within one burst.
+
+    Attributes:
+        rate (float): Tokens added per second.
+        burst (float): Capacity of a bucket.
+        max_buckets (int): Number of buckets kept.
+    """
+    def __init__(self, rate, burst, max_buckets=10000):
+        self.rate = rate
+        self.burst = burst
+        self.max_buckets = max_buckets
+        self.lock = threading.Lock()
+        self.buckets = OrderedDict()
+
+    def consume(self, user_key, cost):
+        """
+        Take tokens from a user's bucket.
+
+        Parameters:
+            user_key: Primary key of the user.
+            cost (float): Number of tokens the request costs.
+
+        Returns:
+            float: 0 if the tokens were taken, otherwise seconds until the bucket holds enough tokens.
+        """
+        now = time.monotonic()
+        with self.lock:
+            tokens, refilled_at = self.buckets.pop(user_key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - refilled_at) * self.rate)
+            retry_after = 0 if tokens >= cost else (cost - tokens) / self.rate
+            if not retry_after:
+                tokens -= cost
+            self.buckets[user_key] = (tokens, now)
+            if len(self.buckets) > self.max_buckets:
+                self.buckets.popitem(last=False)
+        return retry_after
+
+    def refund(self, user_key, cost):
+        """
+        Give back the tokens of a request that was not served.
+
+        Parameters:
+            user_key: Primary key of the user.
+            cost (float): Number of tokens the request cost.
+        """
+        with self.lock:
+            if user_key in self.buckets:
+                tokens, refilled_at = self.buckets[user_key]
+                self.buckets[user_key] = (min(self.burst, tokens + cost), refilled_at)
+
+
+class DatabaseTokenBuckets:
+    """
+    Per-user token buckets stored in AdmissionBucket, shared by all workers.
+
+    Every request locks the user's bucket row for one short read-modify-write transaction.
+
+    Attributes:
+        rate (float): Tokens added per second.
+        burst (float): Capacity of a bucket.
+    """
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+
+    def consume(self, user_key, cost):
+        """
+        Take tokens from a user's bucket.
+
+        Parameters:
+            user_key: Primary key of the user.
+            cost (float): Number of tokens the request costs.
+
+        Returns:
+            float: 0 if the tokens were taken, otherwise seconds until the bucket holds enough tokens.
+        """
+        now = datetime.now()
+        with transaction.atomic():
+            bucket, created = AdmissionBucket.objects.select_for_update().get_or_create(
+                user_id=user_key, defaults={'tokens': self.burst, 'refilled_date': now})
+            tokens = min(self.burst, bucket.tokens + max((now - bucket.refilled_date).total_seconds(), 0) * self.rate)
+            retry_after = 0 if tokens >= cost else (cost - tokens) / self.rate
+            if not retry_after:
+                tokens -= cost
+            bucket.tokens, bucket.refilled_date = tokens, now
+            bucket.save(update_fields=['tokens', 'refilled_date', 'modified_date'])
+        return retry_after
+
+    def refund(self, user_key, cost):
+        """
+        Give back the tokens of a request that was not served.
+
+        Parameters:
+            user_key: Primary key of the user.
+            cost (float): Number of tokens the request cost.
+        """
+        AdmissionBucket.objects.filter(user_id=user_key).update(tokens=Least(F('tokens') + cost, self.burst), modified_date=datetime.now())
+
+
+class AdmissionController:
+    """
+    Admits requests by per-user token buckets weighted by endpoint cost, and per-endpoint-class concurrency limits.
+
+    A request first pays the cost of its endpoint class from the user's token bucket, and is
+    rejected with 429 when the bucket is empty, so one user cannot use up the capacity of the
+    others. It then waits for one of the concurrency slots of its endpoint class in this worker;
+    if none frees up within the latency target the request is shed with 503 instead of queueing,
+    which keeps the latency of admitted requests bounded under overload. A shed request gets its
+    tokens back, so retrying it is not throttled for load that was never served.
+
+    Attributes:
+        buckets (LocalTokenBuckets or DatabaseTokenBuckets): The token buckets.
+        endpoint_classes (dict): Endpoint class name to {'cost': tokens, 'concurrency': slots}.
+        latency_target (float): Longest wait for a concurrency slot, in seconds.
+    """
+    def __init__(self, buckets, endpoint_classes, latency_target):
+        for name, endpoint_class in endpoint_classes.items():
+            if endpoint_class['cost'] > buckets.burst:
+                raise ImproperlyConfigured(f'Cost of the {name} endpoint class exceeds ADMISSION_CONTROL_BURST.')
+        self.buckets = buckets
+        self.endpoint_classes = endpoint_classes
+        self.latency_target = latency_target
+        self.slots = {name: threading.BoundedSemaphore(endpoint_class['concurrency']) for name, endpoint_class in endpoint_classes.items()}
+
+    def admit(self, user_key, endpoint_class):
+        """
+        Admit a request, taking its tokens and a concurrency slot.
+
+        Parameters:
+            user_key: Primary key of the authenticated user.
+            endpoint_class (str): Endpoint class of the request.
+
+        Raises:
+            Throttled: If the user's bucket does not hold enough tokens.
+            ServiceOverloaded: If no concurrency slot freed up within the latency target.
+        """
+        cost = self.endpoint_classes[endpoint_class]['cost']
+        retry_after = self.buckets.consume(user_key, cost)
+        if retry_after:
+            raise Throttled(wait=math.ceil(retry_after), detail='Request limit exceeded; please retry later.')
+        if not self.slots[endpoint_class].acquire(timeout=self.latency_target):
+            self.buckets.refund(user_key, cost)
+            raise ServiceOverloaded(wait=max(math.ceil(self.latency_target), 1))
+
+    def release(self, endpoint_class):
+        """
+        Release the concurrency slot of an admitted request.
+
+        Parameters:
+            endpoint_class (str): Endpoint class of the request.
+        """
+        self.slots[endpoint_class].release()
+
+    @classmethod
+    def from_settings(cls):
+        """
+        Build the controller configured by the ADMISSION_CONTROL_* settings.
+
+        Returns:
+            AdmissionController: The configured controller.
+        """
+        if settings.ADMISSION_CONTROL_BACKEND == 'database':
+            buckets = DatabaseTokenBuckets(settings.ADMISSION_CONTROL_RATE, settings.ADMISSION_CONTROL_BURST)
+        elif settings.ADMISSION_CONTROL_BACKEND == 'local':
+            buckets = LocalTokenBuckets(settings.ADMISSION_CONTROL_RATE, settings.ADMISSION_CONTROL_BURST)
+        else:
+            raise ImproperlyConfigured("ADMISSION_CONTROL_BACKEND must be 'local' or 'database'.")
+        return cls(buckets, settings.ADMISSION_CONTROL_ENDPOINT_CLASSES, settings.ADMISSION_CONTROL_LATENCY_TARGET)
+
+
+admission_controller = AdmissionController.from_settings()
+
+
+class AdmissionControlMixin:
+    """
+    APIView mixin admitting every request through the admission controller after authentication.
+
+    Attributes:
+        admission_classes (dict): HTTP method (lower case) to endpoint class name; methods not
+            listed are not subject to admission control.
+        admission_controller (AdmissionController): The controller admitting the requests.
+    """
+    admission_classes = {}
+    admission_controller = admission_controller
+
+    def get_admission_class(self, request, *args, **kwargs):
+        """
+        Return the endpoint class of a request.
+
+        Parameters:
+            request (Request): The DRF request.
+            **kwargs: URL keyword arguments.
+
+        Returns:
+            str: The endpoint class name, or None if the request is not subject to admission control.
+        """
+        return self.admission_classes.get(request.method.lower())
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self.admitted_class = None
+        admission_class = self.get_admission_class(request, *args, **kwargs)
+        if settings.ADMISSION_CONTROL_ENABLED and admission_class is not None:
+            self.admission_controller.admit(request.user.pk, admission_class)
+            self.admitted_class = admission_class
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        if getattr(self, 'admitted_class', None) is not None:
+            self.admission_controller.release(self.admitted_class)
+            self.admitted_class = None
+        return super().finalize_response(request, response, *args, **kwargs)
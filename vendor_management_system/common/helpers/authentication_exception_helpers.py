@@ -1,6 +1,8 @@
+from rest_framework.exceptions import Throttled
 from rest_framework.views import exception_handler
 from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
 from rest_framework.response import Response
+from common.helpers.admission_helpers import ServiceOverloaded
 
 
 def token_exception_handler(exc, context):
@@ -8,7 +10,8 @@ def token_exception_handler(exc, context):
     Custom exception handler for handling token-related exceptions.
 
     This function intercepts exceptions related to token validation, such as TokenError and InvalidToken,
-    and returns a customized response with appropriate status and message.
+    and returns a customized response with appropriate status and message. Requests rejected by
+    admission control keep their 429/503 status and Retry-After header.
 
     Parameters:
         exc (Exception): The exception instance.
@@ -32,4 +35,12 @@ def token_exception_handler(exc, context):
         else:
             response = Response(custom_data, status=401)
 
+    if isinstance(exc, (Throttled, ServiceOverloaded)):
+        response.data = {
+            "status_code": -1,
+            "status_type": "RESPONSE_STATUS_OVERLOADED",
+            "status_message": str(exc.detail),
+            "results": {}
+        }
+
     return response
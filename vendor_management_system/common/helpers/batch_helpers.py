@@ -0,0 +1,131 @@
+import json
+from contextlib import nullcontext
+from io import BytesIO
+from urllib.parse import urlsplit
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIRequest
+from django.db import transaction
+from django.urls import Resolver404, resolve
+from rest_framework.views import APIView
+from common.custom_exceptions import CustomExceptions
+
+BATCH_METHODS = ('GET', 'POST', 'PUT', 'DELETE')
+BATCH_NAMESPACES = ('vendor', 'home')
+BATCH_SERVER_KEYS = ('SERVER_NAME', 'SERVER_PORT', 'SERVER_PROTOCOL', 'HTTP_HOST', 'REMOTE_ADDR')
+
+
+class BatchHelper:
+    """
+    A helper class executing a batch of API operations within one request.
+
+    Every operation is dispatched straight to the view its path resolves to, as the already
+    authenticated user of the batch request: middleware and JWT verification run once for the
+    whole batch, and all operations share the request's database connection.
+
+    Methods:
+        __init__(self):
+            Initialize an instance of the BatchHelper.
+    """
+    def __init__(self):
+        pass
+
+    def validate_operations(self, operations):
+        """
+        Check the operations of a batch and resolve their views.
+
+        Parameters:
+            operations (list): Operations, each a dict with 'method', 'path' and optional 'body' and 'headers'.
+
+        Returns:
+            list: (operation, resolver match) of every operation.
+
+        Raises:
+            CustomExceptions: If the batch is empty or too large, or an operation is invalid.
+        """
+        if not isinstance(operations, list) or not operations:
+            raise CustomExceptions('Batch operations must be a non-empty list.')
+        if len(operations) > settings.BATCH_MAX_OPERATIONS:
+            raise CustomExceptions(f'A batch can contain at most {settings.BATCH_MAX_OPERATIONS} operations.')
+
+        resolved_operations = []
+        for index, operation in enumerate(operations):
+            if not isinstance(operation, dict) or str(operation.get('method')).upper() not in BATCH_METHODS:
+                raise CustomExceptions(f'Operation {index} must have a method among {", ".join(BATCH_METHODS)}.')
+            try:
+                match = resolve(urlsplit(operation.get('path') or '').path)
+            except Resolver404:
+                match = None
+            # Only REST API views can be batched, not e.g. the performance metrics stream.
+            if match is None or match.app_name not in BATCH_NAMESPACES or not issubclass(getattr(match.func, 'cls', object), APIView):
+                raise CustomExceptions(f'Operation {index} path {operation.get("path")} is not a vendor or auth API endpoint.')
+            resolved_operations.append((operation, match))
+        return resolved_operations
+
+    def build_request(self, request, operation):
+        """
+        Build the request of an operation, authenticated as the user of the batch request.
+
+        The request carries only the server and client address of the batch request and the
+        operation's own headers: headers of the batch request, like its Idempotency-Key, do not
+        apply to its operations.
+
+        Parameters:
+            request (Request): The batch request.
+            operation (dict): The operation.
+
+        Returns:
+            WSGIRequest: The request to dispatch to the operation's view.
+        """
+        url = urlsplit(operation['path'])
+        body = json.dumps(operation['body']).encode() if operation.get('body') is not None else b''
+        environ = {key: request.META[key] for key in BATCH_SERVER_KEYS if key in request.META}
+        environ.update({
+            'REQUEST_METHOD': operation['method'].upper(),
+            'PATH_INFO': url.path,
+            'SCRIPT_NAME': '',
+            'QUERY_STRING': url.query,
+            'CONTENT_TYPE': 'application/json',
+            'CONTENT_LENGTH': str(len(body)),
+            'wsgi.input': BytesIO(body),
+            'wsgi.url_scheme': request.scheme,
+        })
+        for header, value in (operation.get('headers') or {}).items():
+            environ[f'HTTP_{header.upper().replace("-", "_")}'] = str(value)
+
+        sub_request = WSGIRequest(environ)
+        # DRF authenticates requests carrying a forced user without running the authentication classes.
+        sub_request._force_auth_user = request.user
+        sub_request._force_auth_token = request.auth
+        return sub_request
+
+    def execute_batch(self, request, operations, atomic=False):
+        """
+        Execute the operations of a batch in order.
+
+        Parameters:
+            request (Request): The authenticated batch request.
+            operations (list): Operations, each a dict with 'method', 'path' and optional 'body' and 'headers'.
+            atomic (bool): Run all operations in one transaction, stopping and rolling back at the first failure.
+
+        Returns:
+            dict: 'rolled_back' and the 'operations' results, each with the 'method', 'path', HTTP 'status' and response 'body'.
+
+        Raises:
+            CustomExceptions: If the batch is invalid; no operation is executed then.
+        """
+        resolved_operations = self.validate_operations(operations)
+        results = []
+        rolled_back = False
+        with transaction.atomic() if atomic else nullcontext():
+            for operation, match in resolved_operations:
+                response = match.func(self.build_request(request, operation), *match.args, **match.kwargs)
+                body = response.data
+                results.append({'method': operation['method'].upper(), 'path': operation['path'], 'status': response.status_code, 'body': body})
+                failed = response.status_code >= 400 or (isinstance(body, dict) and body.get('status_code') == -1)
+                if atomic and failed:
+                    transaction.set_rollback(True)
+                    rolled_back = True
+                    break
+
+        return {'rolled_back': rolled_back, 'operations': results}
+
@@ -0,0 +1,206 @@
+import functools
+import hashlib
+import json
+import threading
+import time
+from datetime import datetime, timedelta
+from django.conf import settings
+from django.db import DatabaseError, IntegrityError, connection, transaction
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from common.custom_exceptions import CustomExceptions
+from common.helpers.rest_api_helpers import ResultBuilder
+from common.models import IdempotencyKey
+from common.utils import CommonUtils
+
+IDEMPOTENCY_KEY_HEADER = 'Idempotency-Key'
+
+
+class IdempotencyHelper:
+    """
+    A helper class executing write requests at most once per Idempotency-Key.
+
+    The first request with a key claims it by inserting an in-progress IdempotencyKey row, runs
+    the handler and stores its response. A retry with the same key costs one lookup on the
+    (user, key) unique index and returns the stored response. A concurrent duplicate finds the
+    in-progress row and polls it until the first request stores its response. The in-progress row
+    is refreshed while the handler runs, so it only expires, and can be taken over by a duplicate,
+    once the request holding it is gone, e.g. its worker was killed.
+
+    Only successful responses are stored: when the handler fails the key is released, so the
+    client can retry the request once the failure is fixed.
+    """
+
+    def get_request_fingerprint(self, request):
+        """
+        Compute the fingerprint identifying the request a key was used with.
+
+        Parameters:
+            request (Request): The DRF request.
+
+        Returns:
+            str: SHA-256 hex digest of the method, path and request data.
+        """
+        request_data = json.dumps(request.data, sort_keys=True, default=str)
+        return hashlib.sha256(f'{request.method}\n{request.path}\n{request_data}'.encode()).hexdigest()
+
+    def get_stored_response(self, idempotency_key):
+        """
+        Rebuild the response stored for a completed key.
+
+        Parameters:
+            idempotency_key (IdempotencyKey): The completed key.
+
+        Returns:
+            Response: The stored response, flagged with an Idempotent-Replayed header.
+        """
+        response = Response(idempotency_key.response_body, status=idempotency_key.response_status,
+                            headers={'Idempotent-Replayed': 'true'})
+        response.accepted_renderer = JSONRenderer()
+        response.accepted_media_type = "application/json"
+        response.renderer_context = {}
+        return response
+
+    def claim_key(self, user, key, request_fingerprint):
+        """
+        Insert the in-progress row of a key.
+
+        Parameters:
+            user (User): The authenticated user.
+            key (str): The Idempotency-Key header value.
+            request_fingerprint (str): Fingerprint of the request.
+
+        Returns:
+            IdempotencyKey: The claimed key, or None if another request holds it.
+        """
+        expires_at = datetime.now() + timedelta(seconds=settings.IDEMPOTENCY_IN_PROGRESS_TTL)
+        try:
+            with transaction.atomic():
+                return IdempotencyKey.objects.create(user=user, key=key, request_fingerprint=request_fingerprint, expires_at=expires_at)
+        except IntegrityError:
+            return None
+
+    def execute(self, request, key, handler):
+        """
+        Execute a write request at most once for the given key.
+
+        Parameters:
+            request (Request): The DRF request, already authenticated.
+            key (str): The Idempotency-Key header value.
+            handler (callable): Runs the view method and returns its response.
+
+        Returns:
+            Response: The handler's response, or the response stored for the key.
+
+        Raises:
+            CustomExceptions: If the key was used for a different request, or the request holding
+                the key did not finish in time.
+        """
+        request_fingerprint = self.get_request_fingerprint(request)
+        deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT_TIMEOUT
+        while True:
+            idempotency_key = IdempotencyKey.objects.filter(user=request.user, key=key).first()
+            if idempotency_key is not None and idempotency_key.expires_at <= datetime.now():
+                # Expired response or abandoned in-progress claim, the key can be used again.
+                IdempotencyKey.objects.filter(pk=idempotency_key.pk, expires_at=idempotency_key.expires_at).delete()
+                idempotency_key = None
+
+            if idempotency_key is None:
+                idempotency_key = self.claim_key(request.user, key, request_fingerprint)
+                if idempotency_key is not None:
+                    return self.run_handler(idempotency_key, handler)
+            elif idempotency_key.request_fingerprint != request_fingerprint:
+                raise CustomExceptions(f'{IDEMPOTENCY_KEY_HEADER} {key} was already used for a different request.')
+            elif idempotency_key.status == 'completed':
+                return self.get_stored_response(idempotency_key)
+
+            if time.monotonic() >= deadline:
+                raise CustomExceptions(f'A request with {IDEMPOTENCY_KEY_HEADER} {key} is still being processed; please retry later.')
+            time.sleep(settings.IDEMPOTENCY_POLL_INTERVAL)
+
+    def run_handler(self, idempotency_key, handler):
+        """
+        Run the handler for a claimed key and store its response if it succeeded.
+
+        Parameters:
+            idempotency_key (IdempotencyKey): The claimed key.
+            handler (callable): Runs the view method and returns its response.
+
+        Returns:
+            Response: The handler's response.
+        """
+        claim = IdempotencyKey.objects.filter(pk=idempotency_key.pk, status='in_progress')
+        stop_event = threading.Event()
+        keep_alive_thread = threading.Thread(target=self.keep_claim_alive, args=(idempotency_key.pk, stop_event), daemon=True)
+        keep_alive_thread.start()
+        try:
+            response = handler()
+        except Exception:
+            claim.delete()
+            raise
+        finally:
+            stop_event.set()
+            keep_alive_thread.join()
+
+        if response.data.get('status_code') != 1:
+            claim.delete()
+        elif not claim.update(status='completed', response_body=response.data, response_status=response.status_code,
+                              expires_at=datetime.now() + timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL), modified_date=datetime.now()):
+            # The write is done, only its response could not be stored for retries.
+            CommonUtils.log(f'{IDEMPOTENCY_KEY_HEADER} {idempotency_key.key} was released before its response could be stored.')
+        return response
+
+    def keep_claim_alive(self, pk, stop_event):
+        """
+        Push back the expiry of an in-progress key until the stop event is set, from a separate thread.
+
+        Parameters:
+            pk (int): Primary key of the claimed key.
+            stop_event (Event): Set once the handler returned.
+        """
+        try:
+            while not stop_event.wait(settings.IDEMPOTENCY_IN_PROGRESS_TTL / 3):
+                IdempotencyKey.objects.filter(pk=pk, status='in_progress').update(
+                    expires_at=datetime.now() + timedelta(seconds=settings.IDEMPOTENCY_IN_PROGRESS_TTL))
+        except DatabaseError as e:
+            CommonUtils.log(f'{IDEMPOTENCY_KEY_HEADER} claim could not be refreshed: {e}')
+        finally:
+            # The thread opened its own database connection.
+            connection.close()
+
+
+def idempotent(view_method):
+    """
+    Decorator making an APIView write method honour the Idempotency-Key request header.
+
+    Requests without the header are executed as usual.
+
+    Parameters:
+        view_method (callable): The APIView method, e.g. post or put.
+
+    Returns:
+        callable: The wrapped method.
+    """
+    @functools.wraps(view_method)
+    def wrapper(view, request, *args, **kwargs):
+        key = request.headers.get(IDEMPOTENCY_KEY_HEADER)
+        if not key:
+            return view_method(view, request, *args, **kwargs)
+        try:
+            if len(key) > IdempotencyKey._meta.get_field('key').max_length:
+                raise CustomExceptions(f'{IDEMPOTENCY_KEY_HEADER} must be at most 255 characters long.')
+            return IdempotencyHelper().execute(request, key, lambda: view_method(view, request, *args, **kwargs))
+        except CustomExceptions as e:
+            return ResultBuilder().fail().message(str(e)).get_response_rest()
+    return wrapper
+
+
+def purge_idempotency_keys():
+    """
+    Delete the expired idempotency keys.
+
+    Returns:
+        int: Number of deleted keys.
+    """
+    deleted_count, _ = IdempotencyKey.objects.filter(expires_at__lte=datetime.now()).delete()
+    return deleted_count
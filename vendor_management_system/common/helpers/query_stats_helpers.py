@@ -0,0 +1,345 @@
+import atexit
+import bisect
+import functools
+import hashlib
+import os
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from django.conf import settings
+from django.db import DatabaseError, connection
+from django.db.models import Max, Sum
+from common.models import QueryStat
+from common.utils import CommonUtils
+
+# Upper bounds (in milliseconds) of the latency histogram buckets; the last bucket is unbounded.
+HISTOGRAM_BOUNDS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+QUERY_STATS_ORDERINGS = ('total_time', 'count', 'max_time', 'slow_count')
+
+_COMMENT_RE = re.compile(r'/\*.*?\*/|--[^\n]*', re.S)
+_STRING_RE = re.compile(r"'(?:''|[^'])*'")
+_SAVEPOINT_RE = re.compile(r'\bs\d+_x\d+\b')
+_NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PLACEHOLDER_RE = re.compile(r'%s|%\(\w+\)s')
+_IN_LIST_RE = re.compile(r'\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)', re.I)
+_VALUES_RE = re.compile(r'\bVALUES\s*\([^()]*\)(?:\s*,\s*\([^()]*\))*', re.I)
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+@functools.lru_cache(maxsize=2048)
+def fingerprint_sql(sql):
+    """
+    Normalize a SQL statement into the shape shared by all executions of the same ORM call.
+
+    Literals and placeholders become '?', IN lists and multi-row VALUES lists collapse to
+    '(...)', savepoint names (made of the thread id and a counter) become '?', comments are dropped
+    and whitespace is collapsed, so that e.g. lookups of different vendor codes, bulk inserts of
+    different sizes or savepoints of different threads get the same fingerprint.
+
+    Parameters:
+        sql (str): The SQL statement as sent to the database.
+
+    Returns:
+        tuple: (fingerprint, normalized SQL), the fingerprint being 16 hex digits.
+    """
+    normalized_sql = _COMMENT_RE.sub(' ', sql)
+    normalized_sql = _STRING_RE.sub('?', normalized_sql)
+    normalized_sql = _PLACEHOLDER_RE.sub('?', normalized_sql)
+    normalized_sql = _SAVEPOINT_RE.sub('?', normalized_sql)
+    normalized_sql = _NUMBER_RE.sub('?', normalized_sql)
+    normalized_sql = _IN_LIST_RE.sub('IN (...)', normalized_sql)
+    normalized_sql = _VALUES_RE.sub('VALUES (...)', normalized_sql)
+    normalized_sql = _WHITESPACE_RE.sub(' ', normalized_sql).strip()
+    return hashlib.sha1(normalized_sql.encode()).hexdigest()[:16], normalized_sql
+
+
+def get_percentile(histogram, percentile):
+    """
+    Estimate a latency percentile from a histogram, as the upper bound of the bucket it falls in.
+
+    Parameters:
+        histogram (list): Query counts per HISTOGRAM_BOUNDS bucket, plus the unbounded bucket.
+        percentile (float): The percentile, between 0 and 100.
+
+    Returns:
+        float: The percentile in milliseconds, None for an empty histogram; the unbounded bucket is
+            reported as the last bound.
+    """
+    total = sum(histogram)
+    if not total:
+        return None
+    rank = total * percentile / 100
+    seen = 0
+    for bound, count in zip(HISTOGRAM_BOUNDS + (HISTOGRAM_BOUNDS[-1],), histogram):
+        seen += count
+        if seen >= rank:
+            return bound
+    return HISTOGRAM_BOUNDS[-1]
+
+
+class QueryStatsCollector:
+    """
+    Database execute wrapper aggregating query counts and latencies per SQL fingerprint and call site.
+
+    Every query is timed, fingerprinted and attributed to the innermost frame of the stack inside
+    one of the call site directories, e.g. 'vendor/helpers/vendor_helpers.py:58 get_vendor', or
+    '(other)'. Counts, total and maximum time, a latency histogram and the slowest samples of
+    queries over the slow threshold are kept per (fingerprint, call site) in memory; only the
+    max_entries most recently used pairs are kept, so memory stays bounded. Queries over the slow
+    threshold are also logged.
+
+    The statistics are written to QueryStat, one row per pair and flush window, at the start of
+    the first request after flush_interval seconds, and when a process that served requests exits;
+    the queries of management commands like migrate are not written.
+
+    Attributes:
+        slow_threshold (float): Duration in milliseconds from which a query is slow.
+        max_entries (int): Number of (fingerprint, call site) pairs kept in memory.
+        max_samples (int): Number of slow query samples kept per pair.
+        flush_interval (float): Seconds between two writes of the statistics.
+        call_site_dirs (list): Directories, relative to BASE_DIR, whose frames are call sites.
+    """
+    def __init__(self, slow_threshold, max_entries, max_samples, flush_interval, call_site_dirs):
+        self.slow_threshold = slow_threshold
+        self.max_entries = max_entries
+        self.max_samples = max_samples
+        self.flush_interval = flush_interval
+        self.base_dir = str(settings.BASE_DIR).rstrip(os.sep) + os.sep
+        self.call_site_dirs = tuple(os.path.join(self.base_dir, directory).rstrip(os.sep) + os.sep for directory in call_site_dirs)
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.entries = OrderedDict()
+        self.evicted_count = 0
+        self.window_start = datetime.now()
+        self.flushed_at = time.monotonic()
+        self.pid = os.getpid()
+        self.database_name = None
+        self.served_requests = False
+
+    def __call__(self, execute, sql, params, many, context):
+        if getattr(self.local, 'paused', False):
+            return execute(sql, params, many, context)
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.record(sql, params, (time.perf_counter() - start) * 1000, self.get_call_site(),
+                        context['connection'].settings_dict['NAME'])
+
+    def get_call_site(self):
+        """
+        Return the innermost frame of the current stack inside a call site directory.
+
+        Returns:
+            str: 'path:line function' relative to BASE_DIR, or '(other)'.
+        """
+        frame = sys._getframe(2)
+        while frame is not None:
+            filename = frame.f_code.co_filename
+            if filename.startswith(self.call_site_dirs):
+                return f'{filename[len(self.base_dir):]}:{frame.f_lineno} {frame.f_code.co_name}'
+            frame = frame.f_back
+        return '(other)'
+
+    def record(self, sql, params, duration, call_site, database_name=None):
+        """
+        Add one query to the statistics of its fingerprint and call site.
+
+        Parameters:
+            sql (str): The SQL statement.
+            params: The query parameters.
+            duration (float): Duration of the query in milliseconds.
+            call_site (str): The call site of the query.
+            database_name (str, optional): Name of the database queried.
+        """
+        fingerprint, normalized_sql = fingerprint_sql(sql)
+        slow = duration >= self.slow_threshold
+        with self.lock:
+            self.check_process()
+            if database_name is not None and database_name != self.database_name:
+                # Statistics of another database, e.g. a test database, are never written to this one.
+                self.entries, self.database_name = OrderedDict(), database_name
+            entry = self.entries.pop((fingerprint, call_site), None)
+            if entry is None:
+                entry = {'sql': normalized_sql, 'count': 0, 'total_time': 0.0, 'max_time': 0.0, 'slow_count': 0,
+                         'histogram': [0] * (len(HISTOGRAM_BOUNDS) + 1), 'slow_samples': []}
+            self.entries[(fingerprint, call_site)] = entry
+            if len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evicted_count += 1
+            entry['count'] += 1
+            entry['total_time'] += duration
+            entry['max_time'] = max(entry['max_time'], duration)
+            entry['histogram'][bisect.bisect_left(HISTOGRAM_BOUNDS, duration)] += 1
+            if slow:
+                entry['slow_count'] += 1
+                self.add_sample(entry, sql, params, duration)
+        if slow:
+            CommonUtils.log(f'Slow query ({duration:.1f} ms) at {call_site}: {normalized_sql[:500]}')
+
+    def add_sample(self, entry, sql, params, duration):
+        """
+        Keep a slow query among the slowest samples of its entry.
+
+        Must be called with the lock held.
+        """
+        samples = entry['slow_samples']
+        if len(samples) >= self.max_samples:
+            fastest_sample = min(samples, key=lambda sample: sample['duration'])
+            if fastest_sample['duration'] >= duration:
+                return
+            samples.remove(fastest_sample)
+        samples.append({'duration': round(duration, 3), 'date': datetime.now().strftime("%d-%m-%Y, %H:%M:%S"),
+                        'sql': sql[:5000], 'params': repr(params)[:1000]})
+
+    def flush_due(self):
+        return time.monotonic() - self.flushed_at >= self.flush_interval
+
+    def flush(self, check_table=False):
+        """
+        Write the statistics gathered since the last flush to QueryStat and start a new window.
+
+        Parameters:
+            check_table (bool): Drop the statistics if the QueryStat table does not exist, e.g. before migrating.
+
+        Returns:
+            int: Number of QueryStat rows written.
+        """
+        with self.lock:
+            self.check_process()
+            entries, self.entries = self.entries, OrderedDict()
+            window_start, window_end = self.window_start, datetime.now()
+            self.window_start, self.flushed_at = window_end, time.monotonic()
+        if not entries or self.database_name not in (None, connection.settings_dict['NAME']):
+            return 0
+
+        query_stats = [QueryStat(fingerprint=fingerprint, call_site=call_site[:255], window_start=window_start, window_end=window_end, **entry)
+                       for (fingerprint, call_site), entry in entries.items()]
+        # The statistics' own writes are not recorded.
+        self.local.paused = True
+        try:
+            if check_table and QueryStat._meta.db_table not in connection.introspection.table_names():
+                return 0
+            QueryStat.objects.bulk_create(query_stats)
+        finally:
+            self.local.paused = False
+        return len(query_stats)
+
+    def check_process(self):
+        """
+        Drop the statistics inherited from the parent process after a fork, so they are not written twice.
+
+        Must be called with the lock held.
+        """
+        if self.pid != os.getpid():
+            self.entries, self.pid = OrderedDict(), os.getpid()
+
+
+query_stats_collector = QueryStatsCollector(settings.QUERY_STATS_SLOW_THRESHOLD, settings.QUERY_STATS_MAX_ENTRIES,
+                                            settings.QUERY_STATS_MAX_SAMPLES, settings.QUERY_STATS_FLUSH_INTERVAL,
+                                            settings.QUERY_STATS_CALL_SITE_DIRS)
+
+
+def install_query_stats(connection, **kwargs):
+    """
+    connection_created receiver adding the query statistics collector to a new database connection.
+
+    Parameters:
+        connection (BaseDatabaseWrapper): The new connection.
+    """
+    if settings.QUERY_STATS_ENABLED and query_stats_collector not in connection.execute_wrappers:
+        connection.execute_wrappers.append(query_stats_collector)
+
+
+def flush_query_stats(**kwargs):
+    """
+    request_started receiver writing the query statistics once the flush interval passed.
+
+    Statistics are never written inside a transaction, where they could be rolled back with it.
+    """
+    query_stats_collector.served_requests = True
+    if not query_stats_collector.flush_due() or connection.in_atomic_block:
+        return
+    try:
+        query_stats_collector.flush()
+    except DatabaseError as e:
+        CommonUtils.log(f'Query statistics could not be written: {e}')
+
+
+def flush_query_stats_at_exit():
+    """
+    Write the statistics left when the process exits, only if it served requests.
+    """
+    if not query_stats_collector.served_requests:
+        return
+    try:
+        query_stats_collector.flush(check_table=True)
+    except DatabaseError as e:
+        CommonUtils.log(f'Query statistics could not be written: {e}')
+
+
+atexit.register(flush_query_stats_at_exit)
+
+
+def get_top_queries(hours=24, limit=20, order_by='total_time'):
+    """
+    Return the query fingerprints and call sites with the highest cost over the last hours, from all workers.
+
+    Parameters:
+        hours (float): Length of the reported period, ending now.
+        limit (int): Number of rows returned.
+        order_by (str): One of QUERY_STATS_ORDERINGS, sorted descending.
+
+    Returns:
+        list: One dict per (fingerprint, call site) with the count, total, mean, maximum and
+            estimated p50/p95/p99 time in milliseconds, the slow count, the normalized SQL and the
+            slowest samples.
+
+    Raises:
+        ValueError: If order_by is not supported.
+    """
+    if order_by not in QUERY_STATS_ORDERINGS:
+        raise ValueError(f'order_by must be one of {", ".join(QUERY_STATS_ORDERINGS)}.')
+    query_stats = QueryStat.objects.filter(window_end__gte=datetime.now() - timedelta(hours=hours))
+    top_rows = list(query_stats.values('fingerprint', 'call_site').annotate(
+        count=Sum('count'), total_time=Sum('total_time'), max_time=Max('max_time'), slow_count=Sum('slow_count')
+    ).order_by(f'-{order_by}')[:limit])
+
+    # Histograms and samples are merged in Python, only for the returned rows.
+    details = {}
+    for fingerprint, call_site, sql, histogram, slow_samples in query_stats.filter(
+            fingerprint__in={row['fingerprint'] for row in top_rows}).values_list('fingerprint', 'call_site', 'sql', 'histogram', 'slow_samples'):
+        detail = details.setdefault((fingerprint, call_site), {'sql': sql, 'histogram': [0] * len(histogram), 'slow_samples': []})
+        detail['histogram'] = [total + count for total, count in zip(detail['histogram'], histogram)]
+        detail['slow_samples'] += slow_samples
+
+    top_queries = []
+    for row in top_rows:
+        detail = details[(row['fingerprint'], row['call_site'])]
+        top_queries.append({
+            **row,
+            'mean_time': row['total_time'] / row['count'],
+            'p50_time': get_percentile(detail['histogram'], 50),
+            'p95_time': get_percentile(detail['histogram'], 95),
+            'p99_time': get_percentile(detail['histogram'], 99),
+            'sql': detail['sql'],
+            'slow_samples': sorted(detail['slow_samples'], key=lambda sample: -sample['duration'])[:settings.QUERY_STATS_MAX_SAMPLES],
+        })
+    return top_queries
+
+
+def purge_query_stats(days):
+    """
+    Delete the query statistics older than the given number of days.
+
+    Parameters:
+        days (float): Retention period in days.
+
+    Returns:
+        int: Number of deleted rows.
+    """
+    deleted_count, _ = QueryStat.objects.filter(window_end__lt=datetime.now() - timedelta(days=days)).delete()
+    return deleted_count
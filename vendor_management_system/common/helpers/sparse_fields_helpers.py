@@ -0,0 +1,66 @@
+from common.custom_exceptions import CustomExceptions
+
+
+class SparseFieldsSerializerMixin:
+    """
+    ModelSerializer mixin accepting a ``fields`` argument that limits the serialized fields.
+
+    Attributes:
+        fields (list, optional): Names of the fields to serialize; all fields when not given.
+    """
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop('fields', None)
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for field_name in set(self.fields) - set(fields):
+                self.fields.pop(field_name)
+
+
+def get_sparse_fields(request, serializer_class):
+    """
+    Read the sparse fieldset of a request from its ``fields`` and ``exclude`` query parameters.
+
+    Both parameters are comma separated field names, e.g. ``?fields=po_number,status`` or
+    ``?exclude=items``; when both are given the excluded fields are removed from ``fields``.
+
+    Parameters:
+        request (Request): The DRF request.
+        serializer_class (class): The serializer of the returned objects.
+
+    Returns:
+        list: Names of the fields to return, or None if the request returns all fields.
+
+    Raises:
+        CustomExceptions: If a parameter names fields the serializer does not have.
+    """
+    fields_param = request.query_params.get('fields')
+    exclude_param = request.query_params.get('exclude')
+    if not fields_param and not exclude_param:
+        return None
+
+    available_fields = list(serializer_class().fields)
+    fields = _parse_field_names(fields_param, available_fields) if fields_param else available_fields
+    excluded_fields = _parse_field_names(exclude_param, available_fields) if exclude_param else []
+    return [field for field in fields if field not in excluded_fields]
+
+
+def _parse_field_names(param, available_fields):
+    field_names = [field.strip() for field in param.split(',') if field.strip()]
+    unknown_fields = [field for field in field_names if field not in available_fields]
+    if unknown_fields:
+        raise CustomExceptions(f'Unknown field(s): {", ".join(unknown_fields)}; available fields are {", ".join(available_fields)}.')
+    return field_names
+
+
+def only_fields(queryset, fields):
+    """
+    Restrict a queryset to the columns of a sparse fieldset, so other columns are never fetched.
+
+    Parameters:
+        queryset (QuerySet): Queryset of the model behind the serializer.
+        fields (list): Names of the serialized fields, or None for all fields.
+
+    Returns:
+        QuerySet: The queryset, deferring the columns outside the fieldset.
+    """
+    return queryset if fields is None else queryset.only(*fields)
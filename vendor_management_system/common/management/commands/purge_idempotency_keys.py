@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from common.helpers.idempotency_helpers import purge_idempotency_keys
+
+
+class Command(BaseCommand):
+    """
+    Management command deleting expired idempotency keys.
+
+    Meant to be run periodically (e.g. from cron); expired keys are ignored by the API until then.
+    """
+    help = 'Delete idempotency keys whose stored response has expired.'
+
+    def handle(self, *args, **options):
+        deleted_count = purge_idempotency_keys()
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted_count} expired idempotency keys.'))
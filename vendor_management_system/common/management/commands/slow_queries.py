@@ -0,0 +1,38 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from common.helpers.query_stats_helpers import QUERY_STATS_ORDERINGS, get_top_queries, purge_query_stats
+
+
+class Command(BaseCommand):
+    """
+    Management command printing the most expensive SQL fingerprints and their call sites.
+
+    Statistics are written by every worker once per QUERY_STATS_FLUSH_INTERVAL, so the last
+    minute of activity may not be included yet.
+    """
+    help = 'Print the top query fingerprints per call site by total time, count, maximum time or slow count.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', type=float, default=24, help='Report the queries of the last this many hours.')
+        parser.add_argument('--limit', type=int, default=20, help='Number of fingerprints and call sites printed.')
+        parser.add_argument('--order-by', choices=QUERY_STATS_ORDERINGS, default='total_time', help='Column the report is sorted by.')
+        parser.add_argument('--samples', action='store_true', help='Also print the slowest sampled queries.')
+        parser.add_argument('--purge', action='store_true', help='Delete statistics older than QUERY_STATS_RETENTION_DAYS first.')
+
+    def handle(self, *args, **options):
+        if options['purge']:
+            deleted_count = purge_query_stats(settings.QUERY_STATS_RETENTION_DAYS)
+            self.stdout.write(f'Deleted {deleted_count} query statistics older than {settings.QUERY_STATS_RETENTION_DAYS} days.')
+
+        top_queries = get_top_queries(options['hours'], options['limit'], options['order_by'])
+        if not top_queries:
+            self.stdout.write(f"No queries recorded in the last {options['hours']:g} hours.")
+            return
+        self.stdout.write(f"{'count':>10} {'total ms':>12} {'mean ms':>9} {'p95 ms':>7} {'max ms':>10} {'slow':>6}  call site / fingerprint")
+        for query in top_queries:
+            self.stdout.write(f"{query['count']:>10} {query['total_time']:>12.1f} {query['mean_time']:>9.2f} {query['p95_time']:>7} "
+                              f"{query['max_time']:>10.1f} {query['slow_count']:>6}  {query['call_site']} [{query['fingerprint']}]")
+            self.stdout.write(f"{'':>60}{query['sql'][:200]}")
+            if options['samples']:
+                for sample in query['slow_samples']:
+                    self.stdout.write(f"{'':>60}{sample['duration']} ms at {sample['date']}: {sample['sql'][:500]} {sample['params']}")
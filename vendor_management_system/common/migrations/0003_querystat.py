@@ -0,0 +1,43 @@
+# Generated by Django 4.2.8 on 2026-10-19 11:09
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('common', '0002_admissionbucket'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QueryStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('is_deleted', models.BooleanField(default=False)),
+                ('created_date', models.DateTimeField(auto_now_add=True)),
+                ('deleted_date', models.DateTimeField(blank=True, null=True)),
+                ('modified_date', models.DateTimeField(auto_now=True)),
+                ('fingerprint', models.CharField(max_length=16)),
+                ('call_site', models.CharField(max_length=255)),
+                ('sql', models.TextField()),
+                ('window_start', models.DateTimeField()),
+                ('window_end', models.DateTimeField()),
+                ('count', models.PositiveBigIntegerField()),
+                ('total_time', models.FloatField()),
+                ('max_time', models.FloatField()),
+                ('slow_count', models.PositiveBigIntegerField(default=0)),
+                ('histogram', models.JSONField()),
+                ('slow_samples', models.JSONField(blank=True, default=list)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='%(app_label)s_%(class)s_created_by', to=settings.AUTH_USER_MODEL)),
+                ('deleted_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='%(app_label)s_%(class)s_deleted_by', to=settings.AUTH_USER_MODEL)),
+                ('modified_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='%(app_label)s_%(class)s_modified_by', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['window_end', 'fingerprint'], name='common_quer_window__36badc_idx')],
+            },
+        ),
+    ]
@@ -16,3 +16,88 @@ class CommonModel(models.Model):
 	created_date = models.DateTimeField(auto_now_add=True)
 	deleted_date = models.DateTimeField(null=True, blank=True)
 	modified_date = models.DateTimeField(auto_now=True)
+
+	def validate(self):
+		"""
+		Run field validation before a write.
+
+		Uniqueness is enforced by the database constraints, and foreign keys whose
+		related object is already loaded are not looked up again.
+		"""
+		exclude = [field.name for field in self._meta.concrete_fields if field.is_relation and field.is_cached(self)]
+		self.full_clean(exclude=exclude, validate_unique=False)
+
+
+class IdempotencyKey(CommonModel):
+	"""
+	Idempotency Key Model.
+
+	Stores the response of a write request sent with an Idempotency-Key header, so that a retry
+	with the same key is answered from this table instead of executing the write again. Keys are
+	scoped per user and evicted after expires_at by the purge_idempotency_keys command.
+	"""
+	STATUS_CHOICES = [
+		('in_progress', 'In progress'),
+		('completed', 'Completed'),
+	]
+
+	class Meta:
+		constraints = [
+			models.UniqueConstraint(fields=['user', 'key'], name='unique_idempotency_key_per_user'),
+		]
+
+	user = models.ForeignKey(User, related_name="idempotency_key_user", on_delete=models.CASCADE)
+	key = models.CharField(max_length=255)
+	request_fingerprint = models.CharField(max_length=64)
+	status = models.CharField(max_length=11, choices=STATUS_CHOICES, default='in_progress')
+	response_body = models.JSONField(null=True, blank=True)
+	response_status = models.PositiveSmallIntegerField(null=True, blank=True)
+	expires_at = models.DateTimeField(db_index=True)
+
+	def __str__(self):
+		return f'{self.user} - {self.key}'
+
+
+class AdmissionBucket(CommonModel):
+	"""
+	Admission Bucket Model.
+
+	Token bucket of a user, shared by all workers when ADMISSION_CONTROL_BACKEND is 'database'.
+	The bucket holds tokens as of refilled_date; the refill since then is computed on the next request.
+	"""
+	user = models.OneToOneField(User, primary_key=True, related_name="admission_bucket_user", on_delete=models.CASCADE)
+	tokens = models.FloatField()
+	refilled_date = models.DateTimeField()
+
+	def __str__(self):
+		return f'{self.user} - {self.tokens}'
+
+
+class QueryStat(CommonModel):
+	"""
+	Query Stat Model.
+
+	Aggregated statistics of the database queries with one SQL fingerprint and call site, executed
+	by one worker process between window_start and window_end. Times are in milliseconds; histogram
+	holds the query counts per latency bucket and slow_samples the slowest queries over the slow
+	query threshold.
+	"""
+	class Meta:
+		indexes = [
+			models.Index(fields=['window_end', 'fingerprint']),
+		]
+
+	fingerprint = models.CharField(max_length=16)
+	call_site = models.CharField(max_length=255)
+	sql = models.TextField()
+	window_start = models.DateTimeField()
+	window_end = models.DateTimeField()
+	count = models.PositiveBigIntegerField()
+	total_time = models.FloatField()
+	max_time = models.FloatField()
+	slow_count = models.PositiveBigIntegerField(default=0)
+	histogram = models.JSONField()
+	slow_samples = models.JSONField(default=list, blank=True)
+
+	def __str__(self):
+		return f'{self.fingerprint} - {self.call_site}'
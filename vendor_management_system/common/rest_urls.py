@@ -0,0 +1,7 @@
+from django.urls import path
+import common.rest_views as rest_views
+
+urlpatterns = [
+    path('batch/', rest_views.BatchView.as_view(), name='batch-view'),
+    path('query-stats/', rest_views.QueryStatsView.as_view(), name='query-stats-view'),
+]
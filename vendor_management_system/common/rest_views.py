@@ -0,0 +1,194 @@
+from rest_framework.views import APIView
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from common.helpers.rest_api_helpers import ResultBuilder
+from common.helpers.batch_helpers import BatchHelper
+from common.helpers.query_stats_helpers import get_top_queries
+from common.custom_exceptions import CustomExceptions, CustomFormErrorExceptions
+
+
+class BatchView(APIView):
+    """
+    A class representing an API view executing a batch of vendor and auth API operations in one request.
+
+    Attributes:
+        authentication_classes (list): A list of authentication classes, including JWTAuthentication.
+        permission_classes (list): A list of permission classes, including IsAuthenticated.
+
+    Methods:
+        post(self, request, *args, **kwargs):
+            Post method to execute a batch of operations.
+    """
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, *args, **kwargs):
+        """
+        Handle POST requests to execute an ordered list of API operations.
+
+        The batch request is authenticated once; every operation runs as the same user, in order,
+        and gets its own result. With "atomic" set, all operations run in one transaction that is
+        rolled back at the first failed operation, and the remaining operations are not executed.
+
+        Parameters:
+            request (HttpRequest): The HTTP request object.
+            *args: Variable-length argument list.
+            **kwargs: Not used.
+
+        Returns:
+            Response: A JSON response with the result of the operation.
+            Possible status codes:
+                - 200 OK: Batch executed, the result of every operation is in the results.
+                - 400 Bad Request: Invalid batch.
+                - 500 Internal Server Error: An unexpected error occurred.
+
+        Raises:
+            CustomFormErrorExceptions: If there is an issue with the request data format.
+            CustomExceptions: For other custom exceptions.
+
+        Request Data Format:
+            {
+                "atomic": false,
+                "operations": [
+                    {"method": "POST", "path": "/api/purchase_orders/1221/acknowledge/"},
+                    {"method": "GET", "path": "/api/vendors/131/?fields=vendor_code,name"}
+                ]
+            }
+
+        Response Format:
+            {
+                "status_code": 1,
+                "status_type": "RESPONSE_STATUS_OK",
+                "status_message": "Successfully executed batch operations.",
+                "results": {
+                    "rolled_back": false,
+                    "operations": [
+                        {
+                            "method": "POST",
+                            "path": "/api/purchase_orders/1221/acknowledge/",
+                            "status": 200,
+                            "body": {
+                                "status_code": 1,
+                                "status_type": "RESPONSE_STATUS_OK",
+                                "status_message": "Vendor successfully acknowledged a purchase order.",
+                                "results": {...}
+                            }
+                        },
+                        {
+                            "method": "GET",
+                            "path": "/api/vendors/131/?fields=vendor_code,name",
+                            "status": 200,
+                            "body": {
+                                "status_code": 1,
+                                "status_type": "RESPONSE_STATUS_OK",
+                                "status_message": "Successfully fetched vendor details.",
+                                "results": {
+                                    "vendor_code": "131",
+                                    "name": "vendor2"
+                                }
+                            }
+                        }
+                    ]
+                }
+            }
+        """
+        batch_data = request.data
+        try:
+            temp_resp = BatchHelper().execute_batch(request, batch_data.get('operations'), atomic=bool(batch_data.get('atomic', False)))
+            response_object = ResultBuilder().success().message("Successfully executed batch operations.").result_object(temp_resp).get_response_rest()
+        except CustomFormErrorExceptions as e:
+            get_error_msg = e.get_error_msg()
+            full_error_dict = e.get_full_error_dict()
+            response_object = ResultBuilder().fail().message(get_error_msg).result_object(full_error_dict).get_response_rest()
+        except CustomExceptions as e:
+            err_msg = str(e)
+            response_object = ResultBuilder().fail().message(err_msg).get_response_rest()
+        except Exception as e:
+            err_msg = str(e)
+            response_object = ResultBuilder().fail().message(err_msg).get_response_rest()
+
+        return response_object
+
+
+class QueryStatsView(APIView):
+    """
+    A class representing an admin-only API view reporting the most expensive SQL fingerprints and their call sites.
+
+    Attributes:
+        authentication_classes (list): A list of authentication classes, including JWTAuthentication.
+        permission_classes (list): A list of permission classes, including IsAdminUser.
+
+    Methods:
+        get(self, request, *args, **kwargs):
+            Get method to retrieve the top queries.
+    """
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated, IsAdminUser]
+
+    def get(self, request, *args, **kwargs):
+        """
+        Handle GET requests to retrieve the top query fingerprints per call site over a recent period.
+
+        Parameters:
+            request (HttpRequest): The HTTP request object.
+            *args: Variable-length argument list.
+            **kwargs: Not used.
+
+        Query Parameters:
+            hours (float, optional): Length of the reported period, ending now; 24 by default.
+            limit (int, optional): Number of rows returned; 20 by default.
+            order_by (str, optional): "total_time" (default), "count", "max_time" or "slow_count".
+
+        Returns:
+            Response: A JSON response with the result of the operation.
+            Possible status codes:
+                - 200 OK: Successful retrieval of the query statistics.
+                - 403 Forbidden: The user is not a staff user.
+                - 500 Internal Server Error: An unexpected error occurred.
+
+        Raises:
+            CustomFormErrorExceptions: If there is an issue with the request data format.
+            CustomExceptions: For other custom exceptions.
+
+        Response Format:
+            {
+                "status_code": 1,
+                "status_type": "RESPONSE_STATUS_OK",
+                "status_message": "Successfully fetched query statistics.",
+                "results": [
+                    {
+                        "fingerprint": "3f9a0c1d2e4b5a67",
+                        "call_site": "vendor/helpers/vendor_helpers.py:58 get_vendor",
+                        "count": 18230,
+                        "total_time": 20413.2,
+                        "max_time": 412.7,
+                        "slow_count": 4,
+                        "mean_time": 1.12,
+                        "p50_time": 1,
+                        "p95_time": 5,
+                        "p99_time": 25,
+                        "sql": "SELECT ... FROM \"vendor_vendor\" WHERE \"vendor_vendor\".\"vendor_code\" = ? LIMIT ?",
+                        "slow_samples": [
+                            {"duration": 412.7, "date": "19-10-2026, 10:02:11", "sql": "SELECT ...", "params": "('128',)"}
+                        ]
+                    }
+                ]
+            }
+        """
+        try:
+            hours = float(request.query_params.get('hours', 24))
+            limit = int(request.query_params.get('limit', 20))
+            temp_resp = get_top_queries(hours, limit, request.query_params.get('order_by', 'total_time'))
+            response_object = ResultBuilder().success().message("Successfully fetched query statistics.").result_object(temp_resp).get_response_rest()
+        except CustomFormErrorExceptions as e:
+            get_error_msg = e.get_error_msg()
+            full_error_dict = e.get_full_error_dict()
+            response_object = ResultBuilder().fail().message(get_error_msg).result_object(full_error_dict).get_response_rest()
+        except CustomExceptions as e:
+            err_msg = str(e)
+            response_object = ResultBuilder().fail().message(err_msg).get_response_rest()
+        except Exception as e:
+            err_msg = str(e)
+            response_object = ResultBuilder().fail().message(err_msg).get_response_rest()
+
+        return response_object
@@ -14,7 +14,9 @@ class User(AbstractUser):
     def __str__(self):
         return self.email
     
-    def save(self, *args, **kwargs):
-        self.full_clean()
+    def save(self, *args, validate=True, **kwargs):
+        if validate:
+            # Uniqueness of email and username is enforced by the database constraints.
+            self.full_clean(validate_unique=False)
         super(User, self).save(*args, **kwargs)
 
@@ -4,6 +4,7 @@ from django.contrib.auth import get_user_model
 User = get_user_model()
 from django.contrib.auth import authenticate
 from rest_framework_simplejwt.tokens import RefreshToken
+from django.db import IntegrityError, transaction
 
 
 class AuthenticationHelper:
@@ -78,14 +79,13 @@ class AuthenticationHelper:
         email = data.get('email', None).lower().lstrip()
         password = data.get('password', None).lstrip()
         try:
-            user = User.objects.get(email=email)
-            if user is not None:
-                raise CustomExceptions('User already registered.')
-        except User.DoesNotExist:
-            # Registering a user.
-            user_obj = User.objects.create(username=username, email=email, password=password)
+            # Registering a user, uniqueness of email and username is left to the database constraints.
+            user_obj = User(username=username, email=email)
             user_obj.set_password(password)
-            user_obj.save()
+            with transaction.atomic():
+                user_obj.save()
+        except IntegrityError:
+            raise CustomExceptions('User already registered.')
         except Exception as e:
             CommonUtils.log(e)
             raise CustomExceptions(e)   
\ No newline at end of file
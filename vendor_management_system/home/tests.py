@@ -28,6 +28,19 @@ class RegistrationTest(APITestCase):
         response = self.client.post(url, invalid_data, format='json')
         
         self.assertEqual(response.data['status_code'], -1)
+
+    def test_registration_duplicate_email_failure(self):
+        User.objects.create_user(email="example@gmail.com", username="ExistingUser", password="testpassword")
+        url = reverse('home:registration')
+        data = {
+            "username": "TestUser",
+            "email": "example@gmail.com",
+            "password": "testpassword"
+        }
+        response = self.client.post(url, data, format='json')
+
+        self.assertEqual(response.data['status_code'], -1)
+        self.assertEqual(response.data['status_message'], 'User already registered.')
                 
 
 class LoginTest(APITestCase):
@@ -2,6 +2,9 @@
 ASGI config for vendor_management_system project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Long-lived responses such as the vendor performance metrics stream
+(/api/vendors/performance/stream/) are only served through this entry point,
+run it with an ASGI server (e.g. uvicorn or daphne).
 
 For more information on this file, see
 https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
@@ -74,6 +74,75 @@ SIMPLE_JWT = {
     "AUTH_HEADER_NAME": "HTTP_AUTHORIZATION",
 }
 
+# Server-sent events stream of vendor performance metrics, only served through the ASGI application.
+METRICS_STREAM_POLL_INTERVAL = 5  # Seconds between polls of PerformanceHistory for changes made by other workers.
+METRICS_STREAM_HEARTBEAT_INTERVAL = 15
+# Seconds before a stream is closed and the client reconnects; also how long the subscription of a
+# client that disconnected unnoticed stays in the broker.
+METRICS_STREAM_MAX_DURATION = 300
+METRICS_STREAM_MAX_VENDORS = 100
+
+# Performance history snapshots: an unchanged snapshot is still recorded once per heartbeat interval
+# (seconds). Snapshots are written in batches of PERFORMANCE_HISTORY_FLUSH_SIZE, or after at most
+# PERFORMANCE_HISTORY_FLUSH_INTERVAL seconds; PERFORMANCE_HISTORY_SYNCHRONOUS writes each one immediately.
+PERFORMANCE_HISTORY_HEARTBEAT_INTERVAL = 3600
+PERFORMANCE_HISTORY_FLUSH_SIZE = 500
+PERFORMANCE_HISTORY_FLUSH_INTERVAL = 5
+PERFORMANCE_HISTORY_SYNCHRONOUS = False
+
+# Rolling window sizes (in days) of the rates computed by the compute_vendor_stats command.
+VENDOR_STATS_WINDOWS = (7, 30, 90)
+
+# Server-allocated purchase order numbers: numbers reserved per worker at once, and the prefix
+# used for vendors without their own po_number_prefix.
+PO_NUMBER_BLOCK_SIZE = 100
+PO_NUMBER_DEFAULT_PREFIX = 'PO'
+
+# Idempotency-Key support of the purchase order write endpoints. Stored responses are kept for
+# IDEMPOTENCY_KEY_TTL seconds; the key of an executing request is refreshed every third of
+# IDEMPOTENCY_IN_PROGRESS_TTL and considered abandoned once it was not refreshed for that long.
+# Concurrent duplicates poll for the first response for at most IDEMPOTENCY_WAIT_TIMEOUT seconds.
+IDEMPOTENCY_KEY_TTL = 86400
+IDEMPOTENCY_IN_PROGRESS_TTL = 60
+IDEMPOTENCY_WAIT_TIMEOUT = 10
+IDEMPOTENCY_POLL_INTERVAL = 0.05
+
+# Admission control of the vendor API. Every user has a token bucket refilled at ADMISSION_CONTROL_RATE
+# tokens per second up to ADMISSION_CONTROL_BURST, kept in process ('local') or in the database shared
+# by all workers ('database'). A request costs the tokens of its endpoint class and runs in one of the
+# class' concurrency slots of the worker; requests waiting longer than ADMISSION_CONTROL_LATENCY_TARGET
+# seconds for a slot are shed.
+ADMISSION_CONTROL_ENABLED = True
+ADMISSION_CONTROL_BACKEND = 'local'
+ADMISSION_CONTROL_RATE = 50
+ADMISSION_CONTROL_BURST = 500
+ADMISSION_CONTROL_LATENCY_TARGET = 0.5
+ADMISSION_CONTROL_ENDPOINT_CLASSES = {
+    'list': {'cost': 25, 'concurrency': 4},  # Unpaginated listings.
+    'write': {'cost': 5, 'concurrency': 16},
+    'read': {'cost': 1, 'concurrency': 32},
+    'import': {'cost': 100, 'concurrency': 2},  # Bulk vendor imports.
+}
+
+# Largest number of operations accepted in one /api/batch/ request.
+BATCH_MAX_OPERATIONS = 50
+
+# Bulk vendor import: rows upserted per statement, and number of row errors reported in the response.
+VENDOR_IMPORT_CHUNK_SIZE = 1000
+VENDOR_IMPORT_MAX_ERRORS = 100
+
+# Query statistics per SQL fingerprint and call site (see the slow_queries command). Queries taking
+# QUERY_STATS_SLOW_THRESHOLD milliseconds or more are logged and sampled; the statistics of the
+# QUERY_STATS_MAX_ENTRIES most recent fingerprints and call sites are kept per worker and written
+# every QUERY_STATS_FLUSH_INTERVAL seconds. Call sites are the innermost frames in QUERY_STATS_CALL_SITE_DIRS.
+QUERY_STATS_ENABLED = True
+QUERY_STATS_SLOW_THRESHOLD = 100
+QUERY_STATS_MAX_ENTRIES = 500
+QUERY_STATS_MAX_SAMPLES = 3
+QUERY_STATS_FLUSH_INTERVAL = 60
+QUERY_STATS_RETENTION_DAYS = 7
+QUERY_STATS_CALL_SITE_DIRS = ['vendor/helpers', 'home/helpers', 'common/helpers']
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.postgresql_psycopg2',
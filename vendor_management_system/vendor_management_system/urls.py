@@ -5,4 +5,5 @@ urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/auth/',  include(('home.rest_urls', 'home'), namespace='auth')),
     path('api/',  include(('vendor.rest_urls', 'vendor'), namespace='vendor')),
+    path('api/',  include(('common.rest_urls', 'common'), namespace='common')),
 ]
\ No newline at end of file